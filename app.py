@@ -1,9 +1,8 @@
 import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
 import numpy as np
-from utils import load_config, get_box_coords
-from data_processor import load_and_process_data, get_all_scenarios
+from utils import load_config, get_frame_interval
+from data_processor import load_and_process_data, load_scene_index, query_scene_index, get_all_scenarios
+from scene_figure import build_scene_figure
 
 cfg = load_config()
 
@@ -45,114 +44,13 @@ sorted_frame_ids = sorted(scene_traj['frame_id'].unique())
 
 
 st.title(f"🚘 {cfg['app']['title']}")
-fig = go.Figure()
-
-
-if not scene_map.empty:
-    for fid, group in scene_map[scene_map['type'] == 'ROAD_EDGE'].groupby('feature_id'):
-        fig.add_trace(go.Scatter(
-            x=group.sort_values('order')['x'], y=group.sort_values('order')['y'],
-            mode='lines', line=dict(color=cfg['visuals']['map']['road_edge'], width=2), hoverinfo='skip'))
-    for fid, group in scene_map[scene_map['type'] == 'ROAD_LINE'].groupby('feature_id'):
-        fig.add_trace(go.Scatter(
-            x=group.sort_values('order')['x'], y=group.sort_values('order')['y'],
-            mode='lines', line=dict(color=cfg['visuals']['map']['road_line'], width=1, dash='dash'), hoverinfo='skip'))
-
-
-static_x, static_y, static_hover = [], [], []
-for _, row in static_df.iterrows():
-    xs, ys = get_box_coords(row, cfg)
-    static_x.extend(xs); static_x.append(None)
-    static_y.extend(ys); static_y.append(None)
-    static_hover.extend([f"Static<br>ID: {row['track_id']}"]*5); static_hover.append(None)
-
-fig.add_trace(go.Scatter(
-    x=static_x, y=static_y, mode='lines', fill='toself',
-    fillcolor=cfg['visuals']['vehicles']['static_color'], 
-    line=dict(color=cfg['visuals']['vehicles']['static_border'], width=1),
-    hoverinfo='text', hovertext=static_hover, name='Static Vehicles'
-))
-
-
-trail_x, trail_y = [], []
-all_active = pd.concat([moving_cars_df, vrus_df])
-for tid, group in all_active.groupby('track_id'):
-    trail_x.extend(group['x'].tolist()); trail_x.append(None)
-    trail_y.extend(group['y'].tolist()); trail_y.append(None)
-
-fig.add_trace(go.Scatter(
-    x=trail_x, y=trail_y, mode='lines',
-    line=dict(color=cfg['visuals']['trail']['color'], width=1), 
-    hoverinfo='skip', name='Trails'
-))
-
-
-f0_cars = moving_cars_df[moving_cars_df['frame_id'] == sorted_frame_ids[0]]
-cx, cy = [], []
-for _, row in f0_cars.iterrows():
-    xs, ys = get_box_coords(row, cfg)
-    cx.extend(xs); cx.append(None); cy.extend(ys); cy.append(None)
-fig.add_trace(go.Scatter(
-    x=cx, y=cy, mode='lines', fill='toself', 
-    fillcolor=cfg['visuals']['vehicles']['moving_color'], 
-    line=dict(color='white', width=1), name='Moving Cars'))
-
-
-f0_vrus = vrus_df[vrus_df['frame_id'] == sorted_frame_ids[0]]
-vx, vy = [], []
-for _, row in f0_vrus.iterrows():
-    xs, ys = get_box_coords(row, cfg)
-    vx.extend(xs); vx.append(None); vy.extend(ys); vy.append(None)
-fig.add_trace(go.Scatter(
-    x=vx, y=vy, mode='lines', fill='toself', 
-    fillcolor=cfg['visuals']['vrus']['color'], 
-    line=dict(color='white', width=1), name='Pedestrians/Cyclists'))
-
-
-frames = []
-for fid in sorted_frame_ids:
-    
-    f_cars = moving_cars_df[moving_cars_df['frame_id'] == fid]
-    car_x, car_y, car_h = [], [], []
-    for _, row in f_cars.iterrows():
-        xs, ys = get_box_coords(row, cfg)
-        car_x.extend(xs); car_x.append(None); car_y.extend(ys); car_y.append(None)
-        car_h.extend([f"Car<br>ID: {row['track_id']}<br>V: {row['speed_kmh']:.1f}"]*5); car_h.append(None)
-        
-    
-    f_vrus = vrus_df[vrus_df['frame_id'] == fid]
-    vru_x, vru_y, vru_h = [], [], []
-    for _, row in f_vrus.iterrows():
-        xs, ys = get_box_coords(row, cfg)
-        vru_x.extend(xs); vru_x.append(None); vru_y.extend(ys); vru_y.append(None)
-        vru_h.extend([f"{row['type']}<br>ID: {row['track_id']}"]*5); vru_h.append(None)
-
-    frames.append(go.Frame(
-        data=[
-            go.Scatter(x=car_x, y=car_y, hovertext=car_h),
-            go.Scatter(x=vru_x, y=vru_y, hovertext=vru_h)
-        ],
-        name=str(fid),
-        traces=[len(fig.data)-2, len(fig.data)-1]
-    ))
-
-fig.frames = frames
-
-fig.update_layout(
-    plot_bgcolor=cfg['visuals']['plot_bgcolor'], 
-    paper_bgcolor=cfg['visuals']['background_color'],
-    xaxis=dict(visible=False, showgrid=False, scaleanchor="y", scaleratio=1),
-    yaxis=dict(visible=False, showgrid=False),
-    font=dict(color="#a0a0a0"), height=800, margin=dict(t=40, b=0, l=0, r=0),
-    updatemenus=[dict(type='buttons', showactive=False, y=1, x=0.1, xanchor='right', yanchor='top', pad=dict(t=0, r=10),
-                      buttons=[dict(label='▶ Play', method='animate', args=[None, dict(frame=dict(duration=100, redraw=True), fromcurrent=True, mode='immediate')])])]
-)
+fig = build_scene_figure(scene_traj, scene_map, static_df, moving_cars_df, vrus_df, cfg)
 st.plotly_chart(fig, use_container_width=True)
 
 
 st.markdown("### 📊 场景全量统计")
 
-duration = len(sorted_frame_ids) * 0.1
+duration = len(sorted_frame_ids) * get_frame_interval(scene_traj)
 map_w = scene_traj['x'].max() - scene_traj['x'].min()
 map_h = scene_traj['y'].max() - scene_traj['y'].min()
 
@@ -177,24 +75,37 @@ s4.metric("🚲 骑行者 (Cyclist)", f"{n_cyc}", delta="橙色高亮", delta_co
 
 st.markdown("---")
 st.subheader("📋 原始数据详情")
-with st.expander("🔍 展开数据表", expanded=False):
+if st.checkbox("🔍 展开数据表", value=False):
+    scene_index = load_scene_index(traj_path, map_path, selected_scenario)
     f1, f2, f3 = st.columns(3)
     with f1: 
-        types = ['ALL'] + sorted(list(scene_traj['type'].astype(str).unique()))
+        types = ['ALL'] + list(scene_index['type'].keys())
         sel_type = st.selectbox("筛选类型", types)
     with f2:
-        if sel_type!='ALL': df_f = scene_traj[scene_traj['type']==sel_type]
-        else: df_f = scene_traj
-        ids = ['ALL'] + sorted(list(df_f['track_id'].unique()))
+        if sel_type!='ALL': ids = ['ALL'] + scene_index['type_tracks'][sel_type]
+        else: ids = ['ALL'] + list(scene_index['track_id'].keys())
         sel_id = st.selectbox("筛选ID", ids)
     with f3:
         sel_frame = st.select_slider("筛选帧", options=['ALL']+sorted_frame_ids)
     
-    df_show = scene_traj.copy()
-    if sel_type!='ALL': df_show = df_show[df_show['type']==sel_type]
-    if sel_id!='ALL': df_show = df_show[df_show['track_id']==sel_id]
-    if sel_frame!='ALL': df_show = df_show[df_show['frame_id']==sel_frame]
-    
-    st.dataframe(df_show, use_container_width=True, height=400, hide_index=True)
-    csv = df_show.to_csv(index=False).encode('utf-8')
-    st.download_button(label="📥 下载当前筛选数据 (CSV)", data=csv, file_name=f'waymo_data_{selected_scenario}.csv', mime='text/csv')
\ No newline at end of file
+    rows = query_scene_index(scene_index, type=sel_type, track_id=sel_id, frame_id=sel_frame)
+    filter_key = (selected_scenario, sel_type, sel_id, sel_frame)
+
+    p1, p2, p3 = st.columns([1, 1, 2])
+    with p1:
+        page_size = st.selectbox("每页行数", [50, 100, 500, 1000], index=1)
+    n_pages = max(1, int(np.ceil(len(rows) / page_size)))
+    with p2:
+        page = st.number_input("页码", min_value=1, max_value=n_pages, value=1, step=1, key=f"page_{filter_key}_{page_size}")
+    with p3:
+        st.caption(f"共 {len(rows)} 行 / {n_pages} 页")
+
+    page_rows = rows[(page - 1) * page_size: page * page_size]
+    st.dataframe(scene_traj.iloc[page_rows], use_container_width=True, height=400, hide_index=True)
+
+    # 仅在用户请求时序列化当前筛选结果，避免每次重绘都生成 CSV
+    if st.button("📦 生成导出文件"):
+        st.session_state['export_csv'] = (filter_key, scene_traj.iloc[rows].to_csv(index=False).encode('utf-8'))
+    export = st.session_state.get('export_csv')
+    if export is not None and export[0] == filter_key:
+        st.download_button(label="📥 下载当前筛选数据 (CSV)", data=export[1], file_name=f'waymo_data_{selected_scenario}.csv', mime='text/csv')
@@ -1,6 +1,8 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import os
+from utils import process_scene
 
 @st.cache_data
 def load_and_process_data(traj_path, map_path, scenario_id):
@@ -17,45 +19,39 @@ def load_and_process_data(traj_path, map_path, scenario_id):
     scene_traj = df_traj[df_traj['scenario_id'] == scenario_id].copy()
     scene_map = df_map[df_map['scenario_id'] == scenario_id].copy() if not df_map.empty else pd.DataFrame()
 
-  
-    if 'frame_id' not in scene_traj.columns:
-        times = sorted(scene_traj['timestamp'].unique())
-        time_map = {t: i for i, t in enumerate(times)}
-        scene_traj['frame_id'] = scene_traj['timestamp'].map(time_map)
-    scene_traj = scene_traj.sort_values(by="frame_id")
-
- 
-    if 'vx' in scene_traj.columns:
-        scene_traj['speed_kmh'] = (scene_traj['vx']**2 + scene_traj['vy']**2)**0.5 * 3.6
-    else:
-        scene_traj['speed_kmh'] = 0
-
-    track_stats = scene_traj.groupby('track_id').agg({
-        'speed_kmh': 'max',
-        'type': 'first'
-    })
-    
-    is_vehicle = track_stats['type'].astype(str).str.contains('VEHICLE')
-    is_low_speed = track_stats['speed_kmh'] < 1.0
-    
-
-    static_mask = is_vehicle & is_low_speed
-    
-    static_track_ids = track_stats[static_mask].index.tolist()
-    active_track_ids = track_stats[~static_mask].index.tolist()
-    
-
-    static_df = scene_traj[scene_traj['track_id'].isin(static_track_ids)]
-    active_df = scene_traj[scene_traj['track_id'].isin(active_track_ids)]
-    
- 
-    moving_cars_df = active_df[active_df['type'].str.contains('VEHICLE', na=False)]
-    vrus_df = active_df[~active_df['type'].str.contains('VEHICLE', na=False)]
+    return process_scene(scene_traj, scene_map)
 
-    
-    static_df_first = static_df.groupby('track_id').first().reset_index()
+INDEX_COLUMNS = ['type', 'track_id', 'frame_id']
 
-    return scene_traj, scene_map, static_df_first, moving_cars_df, vrus_df
+@st.cache_data
+def load_scene_index(traj_path, map_path, scenario_id):
+    """
+    为数据面板预建 type / track_id / frame_id 到行号的倒排索引
+    行号对应 load_and_process_data 返回的 scene_traj (按 iloc 取行)
+    """
+    scene_traj = load_and_process_data(traj_path, map_path, scenario_id)[0]
+    index = {}
+    for col in INDEX_COLUMNS:
+        values = scene_traj[col].astype(str) if col == 'type' else scene_traj[col]
+        codes, uniques = pd.factorize(values, sort=True)
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        index[col] = {u: order[bounds[i]:bounds[i + 1]] for i, u in enumerate(uniques)}
+
+    track_ids = scene_traj['track_id'].to_numpy()
+    index['type_tracks'] = {t: sorted(set(track_ids[rows])) for t, rows in index['type'].items()}
+    index['num_rows'] = len(scene_traj)
+    return index
+
+def query_scene_index(index, **filters):
+    """按筛选条件求交集得到行号 (升序)，值为 'ALL' 的条件忽略"""
+    rows = None
+    for col, value in filters.items():
+        if value == 'ALL':
+            continue
+        hit = index[col].get(value, np.array([], dtype=np.int64))
+        rows = hit if rows is None else np.intersect1d(rows, hit, assume_unique=True)
+    return np.arange(index['num_rows']) if rows is None else rows
 
 def get_all_scenarios(traj_path):
     """获取所有场景ID列表"""
@@ -0,0 +1,276 @@
+import os
+import glob
+import json
+import argparse
+import numpy as np
+import pandas as pd
+
+AGENT_FEATURES = ['x', 'y', 'z', 'heading', 'vx', 'vy', 'length', 'width', 'height']
+MAP_FEATURES = ['x', 'y', 'z']
+
+AGENT_TYPE_IDS = {
+    'TYPE_UNSET': 0,
+    'TYPE_VEHICLE': 1,
+    'TYPE_PEDESTRIAN': 2,
+    'TYPE_CYCLIST': 3,
+    'TYPE_OTHER': 4
+}
+
+MAP_TYPE_IDS = {
+    'UNKNOWN': 0,
+    'LANE_CENTER': 1,
+    'ROAD_EDGE': 2,
+    'ROAD_LINE': 3,
+    'LANE_LINE': 4,
+    'CROSSWALK': 5,
+    'STOP_SIGN': 6,
+    'SPEED_BUMP': 7
+}
+
+# 每个分片的数组文件: shard_00000_<name>.npy
+SHARD_ARRAYS = ['agents', 'agent_mask', 'agent_type', 'map', 'map_mask', 'map_type']
+
+class TensorExporter:
+    """
+    将 UIDM 轨迹/地图 CSV 导出为定长张量分片 (.npy) 与 JSON 索引
+
+    填充规则:
+        - 智能体: ego 固定在第 0 位，其余按与 ego 的距离由近到远取 max_agents - 1 个，
+          距离取该智能体首个有效帧时与同帧 ego 的距离 (ego 缺失时取 ego 的参考位置)
+        - 时间: 以场景内第一帧为 t=0，超过 num_timesteps 的帧截断，不足补零
+        - 地图: 折线按 points_per_polyline 个点切段，取离 ego 参考位置最近的 max_polylines 段
+        - 所有填充位置数值为 0，对应的 mask 为 False
+    """
+
+    def __init__(self, output_dir="output/tensors", max_agents=64, num_timesteps=91,
+                 max_polylines=256, points_per_polyline=20, shard_size=1000):
+        self.output_dir = output_dir
+        self.max_agents = max_agents
+        self.num_timesteps = num_timesteps
+        self.max_polylines = max_polylines
+        self.points_per_polyline = points_per_polyline
+        self.shard_size = shard_size
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+
+    def _shard_shapes(self, n):
+        A, T, M, P = self.max_agents, self.num_timesteps, self.max_polylines, self.points_per_polyline
+        return {
+            'agents': ((n, A, T, len(AGENT_FEATURES)), np.float32),
+            'agent_mask': ((n, A, T), np.bool_),
+            'agent_type': ((n, A), np.int8),
+            'map': ((n, M, P, len(MAP_FEATURES)), np.float32),
+            'map_mask': ((n, M, P), np.bool_),
+            'map_type': ((n, M), np.int8)
+        }
+
+    def _select_agents(self, scene_traj, frame_idx):
+        """返回按槽位排序的 track_id 列表以及 ego 参考位置"""
+        is_ego = scene_traj['is_ego'].astype(str).str.lower().isin(['true', '1'])
+        ego = scene_traj[is_ego]
+        if ego.empty:
+            ego = scene_traj[scene_traj['track_id'] == scene_traj['track_id'].iloc[0]]
+        ego_id = ego['track_id'].iloc[0]
+        ego_xy = ego[['x', 'y']].to_numpy(dtype=float)
+        ego_frames = frame_idx[ego.index.to_numpy()]
+        ego_ref = ego_xy[np.argmin(ego_frames)]
+
+        others = scene_traj[scene_traj['track_id'] != ego_id]
+        if others.empty:
+            return [ego_id], ego_ref
+
+        # 每个智能体的首个有效帧
+        first = others.assign(_f=frame_idx[others.index.to_numpy()]).sort_values('_f', kind='stable')
+        first = first.groupby('track_id', sort=False).head(1)
+        ego_pos = np.tile(ego_ref, (len(first), 1))
+        pos = np.searchsorted(ego_frames, first['_f'].to_numpy())
+        pos = np.clip(pos, 0, len(ego_frames) - 1)
+        hit = ego_frames[pos] == first['_f'].to_numpy()
+        ego_pos[hit] = ego_xy[pos[hit]]
+
+        dist = np.hypot(first['x'].to_numpy(dtype=float) - ego_pos[:, 0],
+                        first['y'].to_numpy(dtype=float) - ego_pos[:, 1])
+        order = np.argsort(dist, kind='stable')[:self.max_agents - 1]
+        return [ego_id] + first['track_id'].to_numpy()[order].tolist(), ego_ref
+
+    def _fill_agents(self, scene_traj, out, out_mask, out_type):
+        scene_traj = scene_traj.sort_values(['frame_id', 'track_id'], kind='stable').reset_index(drop=True)
+        frames = np.unique(scene_traj['frame_id'].to_numpy())
+        frame_idx = np.searchsorted(frames, scene_traj['frame_id'].to_numpy())
+        # frame_idx 按 reset 后的行号对齐，ego 的帧已升序
+        track_ids, ego_ref = self._select_agents(scene_traj, frame_idx)
+
+        slot_of = pd.Series(np.arange(len(track_ids)), index=track_ids)
+        slot = scene_traj['track_id'].map(slot_of).to_numpy()
+        keep = ~pd.isna(slot) & (frame_idx < self.num_timesteps)
+        slot = slot[keep].astype(np.int64)
+        t = frame_idx[keep]
+
+        values = scene_traj.reindex(columns=AGENT_FEATURES).fillna(0.0).to_numpy(dtype=np.float32)
+        out[slot, t] = values[keep]
+        out_mask[slot, t] = True
+
+        types = scene_traj.groupby('track_id', sort=False)['type'].first()
+        out_type[:len(track_ids)] = [AGENT_TYPE_IDS.get(str(types[tid]), 0) for tid in track_ids]
+        return ego_ref
+
+    def _fill_map(self, scene_map, ego_ref, out, out_mask, out_type):
+        if scene_map is None or scene_map.empty:
+            return
+        id_col = 'feature_id' if 'feature_id' in scene_map.columns else 'line_id'
+        P = self.points_per_polyline
+
+        scene_map = scene_map.sort_values([id_col, 'order'], kind='stable').reset_index(drop=True)
+        # 在每条折线内按 P 个点切段，segment 为全局段号
+        point_idx = scene_map.groupby(id_col, sort=False).cumcount().to_numpy()
+        new_line = np.r_[True, scene_map[id_col].to_numpy()[1:] != scene_map[id_col].to_numpy()[:-1]]
+        segment = np.cumsum(new_line | (point_idx % P == 0)) - 1
+
+        xyz = scene_map.reindex(columns=MAP_FEATURES).fillna(0.0).to_numpy(dtype=np.float32)
+        dist = np.hypot(xyz[:, 0] - ego_ref[0], xyz[:, 1] - ego_ref[1])
+        seg_dist = np.full(segment[-1] + 1, np.inf)
+        np.minimum.at(seg_dist, segment, dist)
+
+        chosen = np.argsort(seg_dist, kind='stable')[:self.max_polylines]
+        rank = np.full(len(seg_dist), -1)
+        rank[chosen] = np.arange(len(chosen))
+
+        m = rank[segment]
+        keep = m >= 0
+        p = (point_idx % P)[keep]
+        out[m[keep], p] = xyz[keep]
+        out_mask[m[keep], p] = True
+
+        seg_first = np.flatnonzero(np.r_[True, segment[1:] != segment[:-1]])
+        seg_type = scene_map['type'].astype(str).to_numpy()[seg_first]
+        out_type[:len(chosen)] = [MAP_TYPE_IDS.get(seg_type[s], 0) for s in chosen]
+
+    def _open_shard(self, shard_idx, n):
+        prefix = os.path.join(self.output_dir, f"shard_{shard_idx:05d}")
+        arrays = {}
+        for name, (shape, dtype) in self._shard_shapes(n).items():
+            arrays[name] = np.lib.format.open_memmap(f"{prefix}_{name}.npy", mode='w+', dtype=dtype, shape=shape)
+            arrays[name][:] = 0
+        return os.path.basename(prefix), arrays
+
+    def _close_shard(self, shard_name, arrays, n):
+        """落盘当前分片；最后一个分片未写满时截断到实际场景数"""
+        for name, arr in arrays.items():
+            arr.flush()
+            if n < len(arr):
+                path = os.path.join(self.output_dir, f"{shard_name}_{name}.npy")
+                trimmed = np.lib.format.open_memmap(path + ".tmp", mode='w+', dtype=arr.dtype, shape=(n,) + arr.shape[1:])
+                trimmed[:] = arr[:n]
+                trimmed.flush()
+                del trimmed
+                os.replace(path + ".tmp", path)
+        print(f"   -> 分片 {shard_name} 写入完成 ({n} 个场景)")
+
+    def _load_map(self, map_files, scenario_ids):
+        """分块读取地图 CSV，只保留当前轨迹文件涉及的场景"""
+        chunks = []
+        for f in map_files:
+            if not os.path.exists(f):
+                continue
+            for chunk in pd.read_csv(f, chunksize=1_000_000):
+                chunk = chunk[chunk['scenario_id'].isin(scenario_ids)]
+                if not chunk.empty:
+                    chunks.append(chunk)
+        if not chunks:
+            return {}
+        return dict(tuple(pd.concat(chunks, ignore_index=True).groupby('scenario_id', sort=False)))
+
+    def export(self, traj_files, map_files=()):
+        """逐个轨迹文件读取，场景依次填入分片，内存占用以单个文件为上限"""
+        index = {
+            'agent_features': AGENT_FEATURES,
+            'map_features': MAP_FEATURES,
+            'agent_types': AGENT_TYPE_IDS,
+            'map_types': MAP_TYPE_IDS,
+            'max_agents': self.max_agents,
+            'num_timesteps': self.num_timesteps,
+            'max_polylines': self.max_polylines,
+            'points_per_polyline': self.points_per_polyline,
+            'shards': [],
+            'scenarios': []
+        }
+
+        shard_idx, count, shard_name, arrays = 0, 0, None, None
+        for traj_file in traj_files:
+            print(f"🚀 正在导出: {os.path.basename(traj_file)}")
+            df_traj = pd.read_csv(traj_file)
+            map_groups = self._load_map(map_files, df_traj['scenario_id'].unique())
+
+            for scenario_id, scene_traj in df_traj.groupby('scenario_id', sort=False):
+                if arrays is None:
+                    shard_name, arrays = self._open_shard(shard_idx, self.shard_size)
+                ego_ref = self._fill_agents(scene_traj, arrays['agents'][count], arrays['agent_mask'][count], arrays['agent_type'][count])
+                self._fill_map(map_groups.get(scenario_id), ego_ref,
+                               arrays['map'][count], arrays['map_mask'][count], arrays['map_type'][count])
+                index['scenarios'].append({'scenario_id': str(scenario_id), 'shard': shard_idx, 'offset': count})
+                count += 1
+
+                if count == self.shard_size:
+                    self._close_shard(shard_name, arrays, count)
+                    index['shards'].append({'name': shard_name, 'num_scenarios': count})
+                    shard_idx, count, arrays = shard_idx + 1, 0, None
+            del df_traj, map_groups
+
+        if arrays is not None:
+            self._close_shard(shard_name, arrays, count)
+            index['shards'].append({'name': shard_name, 'num_scenarios': count})
+
+        index_path = os.path.join(self.output_dir, "index.json")
+        with open(index_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False, indent=2)
+        print(f"✅ 导出完成: {index_path} (共 {len(index['scenarios'])} 个场景)")
+        return index_path
+
+class ScenarioTensorDataset:
+    """
+    按索引读取导出的张量分片 (map-style，可直接包装为 torch Dataset)
+    每个样本通过 np.memmap 切片得到，不做任何解析
+    """
+
+    def __init__(self, index_path):
+        self.root = os.path.dirname(index_path)
+        with open(index_path, 'r', encoding='utf-8') as f:
+            self.index = json.load(f)
+        self.scenarios = self.index['scenarios']
+        self._shards = {}
+
+    def _shard(self, shard_idx):
+        if shard_idx not in self._shards:
+            name = self.index['shards'][shard_idx]['name']
+            self._shards[shard_idx] = {
+                key: np.load(os.path.join(self.root, f"{name}_{key}.npy"), mmap_mode='r')
+                for key in SHARD_ARRAYS
+            }
+        return self._shards[shard_idx]
+
+    def __len__(self):
+        return len(self.scenarios)
+
+    def __getitem__(self, idx):
+        entry = self.scenarios[idx]
+        shard = self._shard(entry['shard'])
+        sample = {key: np.asarray(arr[entry['offset']]) for key, arr in shard.items()}
+        sample['scenario_id'] = entry['scenario_id']
+        return sample
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="导出定长训练张量")
+    parser.add_argument("--traj", default="output/data_waymo.csv", help="轨迹 CSV 文件或目录")
+    parser.add_argument("--map", default="output/map_waymo.csv", help="地图 CSV 文件")
+    parser.add_argument("--output_dir", default="output/tensors")
+    parser.add_argument("--max_agents", type=int, default=64)
+    parser.add_argument("--num_timesteps", type=int, default=91)
+    parser.add_argument("--max_polylines", type=int, default=256)
+    parser.add_argument("--points_per_polyline", type=int, default=20)
+    parser.add_argument("--shard_size", type=int, default=1000)
+    args = parser.parse_args()
+
+    traj_files = sorted(glob.glob(os.path.join(args.traj, "*.csv"))) if os.path.isdir(args.traj) else [args.traj]
+    exporter = TensorExporter(args.output_dir, args.max_agents, args.num_timesteps,
+                              args.max_polylines, args.points_per_polyline, args.shard_size)
+    exporter.export(traj_files, [args.map])
@@ -0,0 +1,197 @@
+import os
+import glob
+import sqlite3
+import argparse
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+CATEGORY_TYPE_MAP = {
+    'vehicle': 'TYPE_VEHICLE',
+    'pedestrian': 'TYPE_PEDESTRIAN',
+    'bicycle': 'TYPE_CYCLIST',
+}
+
+# nuPlan 采集车 (Chrysler Pacifica) 尺寸
+EGO_LENGTH = 5.176
+EGO_WIDTH = 2.297
+EGO_HEIGHT = 1.777
+# ego_pose 为后轴中心位姿，UIDM 需要车体中心 (同 nuplan-devkit EgoState.build_from_rear_axle)
+EGO_REAR_AXLE_TO_CENTER = 1.461
+
+# SQLite 单条语句的绑定参数上限为 999，按批次拼接 IN (...) 查询
+QUERY_BATCH_SIZE = 500
+
+SCENE_QUERY = """
+    SELECT lidar_pc.token, lidar_pc.timestamp,
+           ego_pose.x, ego_pose.y, ego_pose.z,
+           ego_pose.qw, ego_pose.qx, ego_pose.qy, ego_pose.qz,
+           ego_pose.vx, ego_pose.vy
+    FROM lidar_pc
+    JOIN ego_pose ON ego_pose.token = lidar_pc.ego_pose_token
+    WHERE lidar_pc.scene_token = ?
+    ORDER BY lidar_pc.timestamp
+"""
+
+BOX_QUERY = """
+    SELECT lidar_box.lidar_pc_token, lidar_box.track_token, category.name,
+           lidar_box.x, lidar_box.y, lidar_box.z, lidar_box.yaw,
+           lidar_box.vx, lidar_box.vy,
+           lidar_box.length, lidar_box.width, lidar_box.height
+    FROM lidar_box
+    JOIN track ON track.token = lidar_box.track_token
+    JOIN category ON category.token = track.category_token
+    WHERE lidar_box.lidar_pc_token IN ({})
+"""
+
+def token_to_str(token):
+    """nuPlan 的 token 为 BLOB，统一转成十六进制字符串"""
+    return token.hex() if isinstance(token, (bytes, memoryview)) else str(token)
+
+def quaternion_to_yaw(qw, qx, qy, qz):
+    return np.arctan2(2.0 * (qw * qz + qx * qy), 1.0 - 2.0 * (qy * qy + qz * qz))
+
+class NuPlanExtractor:
+    def __init__(self, output_dir="output", sample_interval=2, num_workers=None):
+        """
+        参数:
+            sample_interval: lidar_pc 为 20Hz，默认每 2 帧取 1 帧，与 Waymo 的 10Hz 对齐
+            num_workers: 并行处理的 log 数，None 表示使用全部 CPU
+        """
+        self.output_dir = output_dir
+        self.sample_interval = sample_interval
+        self.num_workers = num_workers
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+
+    def _ego_rows(self, scenario_id, frames):
+        """frames: SCENE_QUERY 的结果 (已降采样)"""
+        ego = np.array([f[1:] for f in frames], dtype=float)
+        timestamps, z = ego[:, 0] / 1e6, ego[:, 3]
+        heading = quaternion_to_yaw(ego[:, 4], ego[:, 5], ego[:, 6], ego[:, 7])
+        c, s = np.cos(heading), np.sin(heading)
+        # 后轴中心沿航向前移到车体中心
+        x = ego[:, 1] + EGO_REAR_AXLE_TO_CENTER * c
+        y = ego[:, 2] + EGO_REAR_AXLE_TO_CENTER * s
+        # ego_pose 的速度在车体坐标系下，旋转到全局坐标系
+        vx = ego[:, 8] * c - ego[:, 9] * s
+        vy = ego[:, 8] * s + ego[:, 9] * c
+
+        return pd.DataFrame({
+            'scenario_id': scenario_id,
+            'timestamp': timestamps,
+            'frame_id': np.arange(len(frames)),
+            'track_id': 'ego',
+            'type': 'TYPE_VEHICLE',
+            'is_ego': True,
+            'x': x, 'y': y, 'z': z,
+            'heading': heading,
+            'vx': vx, 'vy': vy,
+            'length': EGO_LENGTH,
+            'width': EGO_WIDTH,
+            'height': EGO_HEIGHT
+        })
+
+    def _box_rows(self, conn, scenario_id, frames):
+        """按批次查询本场景所有关键帧的 lidar_box，避免逐帧逐框的 ORM 查询"""
+        frame_index = {f[0]: (i, f[1] / 1e6) for i, f in enumerate(frames)}
+        tokens = list(frame_index.keys())
+        rows = []
+        for start in range(0, len(tokens), QUERY_BATCH_SIZE):
+            batch = tokens[start:start + QUERY_BATCH_SIZE]
+            query = BOX_QUERY.format(','.join('?' * len(batch)))
+            rows.extend(conn.execute(query, batch).fetchall())
+
+        if not rows:
+            return pd.DataFrame()
+
+        pc_tokens, track_tokens, categories = zip(*[r[:3] for r in rows])
+        values = np.array([r[3:] for r in rows], dtype=float)
+        frame_ids, timestamps = zip(*[frame_index[t] for t in pc_tokens])
+
+        return pd.DataFrame({
+            'scenario_id': scenario_id,
+            'timestamp': timestamps,
+            'frame_id': frame_ids,
+            'track_id': [token_to_str(t) for t in track_tokens],
+            'type': [CATEGORY_TYPE_MAP.get(c, 'TYPE_OTHER') for c in categories],
+            'is_ego': False,
+            'x': values[:, 0], 'y': values[:, 1], 'z': values[:, 2],
+            'heading': values[:, 3],
+            'vx': values[:, 4], 'vy': values[:, 5],
+            'length': values[:, 6],
+            'width': values[:, 7],
+            'height': values[:, 8]
+        })
+
+    def iter_scenes(self, db_path):
+        """逐场景产出 UIDM 轨迹表，单个 log 的内存占用以场景为上限"""
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            scene_tokens = [r[0] for r in conn.execute("SELECT token FROM scene ORDER BY rowid")]
+            for scene_token in scene_tokens:
+                frames = conn.execute(SCENE_QUERY, (scene_token,)).fetchall()
+                frames = frames[::self.sample_interval]
+                if not frames:
+                    continue
+
+                scenario_id = token_to_str(scene_token)
+                parts = [self._ego_rows(scenario_id, frames), self._box_rows(conn, scenario_id, frames)]
+                df = pd.concat([p for p in parts if not p.empty], ignore_index=True)
+                yield df.sort_values(by=['frame_id', 'is_ego'], ascending=[True, False], kind='stable')
+        finally:
+            conn.close()
+
+    def process_file(self, db_path):
+        print(f"🚀 正在处理: {os.path.basename(db_path)}")
+        save_name = os.path.join(self.output_dir, os.path.basename(db_path).replace('.db', '.csv'))
+
+        # 先写临时文件，全部场景成功后再改名，避免中途出错留下不完整的 CSV
+        tmp_name = save_name + ".tmp"
+        n_scenes, n_rows = 0, 0
+        try:
+            for df in self.iter_scenes(db_path):
+                df.to_csv(tmp_name, mode='w' if n_scenes == 0 else 'a', header=(n_scenes == 0), index=False)
+                n_scenes += 1
+                n_rows += len(df)
+            if n_scenes > 0:
+                os.replace(tmp_name, save_name)
+        finally:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+
+        print(f"   -> 解析完成，包含 {n_scenes} 个场景")
+        return save_name if n_scenes > 0 else None, n_rows
+
+    def run(self, input_path):
+        if os.path.isdir(input_path):
+            files = sorted(glob.glob(os.path.join(input_path, "*.db")))
+        else:
+            files = [input_path]
+
+        if not files:
+            print(f"❌ 错误：在路径 {input_path} 下没找到 .db 文件")
+            return
+
+        with ProcessPoolExecutor(max_workers=self.num_workers) as pool:
+            futures = {pool.submit(self.process_file, f): f for f in files}
+            for future in as_completed(futures):
+                f = futures[future]
+                try:
+                    save_name, n_rows = future.result()
+                    if save_name:
+                        print(f"✅ 保存成功: {save_name} (数据行数: {n_rows})")
+                except Exception as e:
+                    print(f"❌ 处理文件 {f} 时出错: {e}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="nuPlan SQLite 轨迹提取")
+    parser.add_argument("--dataset_root", default="data/nuplan", help=".db 文件或其所在目录")
+    parser.add_argument("--map_root", default="data/maps", help="nuPlan 地图目录 (轨迹提取暂不使用)")
+    parser.add_argument("--output_dir", default="output")
+    parser.add_argument("--sample_interval", type=int, default=2)
+    parser.add_argument("--num_workers", type=int, default=None)
+    args = parser.parse_args()
+
+    extractor = NuPlanExtractor(args.output_dir, args.sample_interval, args.num_workers)
+    extractor.run(args.dataset_root)
@@ -0,0 +1,187 @@
+import os
+import argparse
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+from concurrent.futures import ProcessPoolExecutor
+from utils import load_config, get_box_coords
+
+# 不同帧在 KD 树中按该偏移量错开 (远大于搜索半径)，一次查询只会命中同帧的邻居
+FRAME_OFFSET = 1e6
+
+METRIC_COLUMNS = ['scenario_id', 'frame_id', 'track_id', 'nearest_id', 'nearest_dist',
+                  'lead_id', 'gap', 'rel_speed', 'ttc', 'overlap']
+
+def _polygon_overlap(box_a, box_b):
+    """分离轴检测两个凸四边形是否重叠，box 为 get_box_coords 返回的闭合坐标"""
+    pa = np.column_stack(box_a)[:4]
+    pb = np.column_stack(box_b)[:4]
+    for poly in (pa, pb):
+        edges = np.roll(poly, -1, axis=0) - poly
+        axes = np.column_stack([-edges[:, 1], edges[:, 0]])
+        proj_a, proj_b = pa.dot(axes.T), pb.dot(axes.T)
+        if np.any((proj_a.max(0) < proj_b.min(0)) | (proj_b.max(0) < proj_a.min(0))):
+            return False
+    return True
+
+class InteractionMetrics:
+    def __init__(self, config_path="config.yaml", radius=50.0, k_neighbors=None,
+                 lane_half_width=1.8, max_heading_diff=np.pi / 4, num_workers=None):
+        """
+        参数:
+            radius: 邻居搜索半径 (m)，半径内的邻居全部参与计算
+            k_neighbors: 可选，每个智能体只保留最近的 k 个邻居；None 表示不截断
+            lane_half_width: 前车判定的横向容差 (m)
+            max_heading_diff: 前车与本车的最大航向差 (rad)
+        """
+        self.cfg = load_config(config_path)
+        self.radius = radius
+        self.k_neighbors = k_neighbors
+        self.lane_half_width = lane_half_width
+        self.max_heading_diff = max_heading_diff
+        self.num_workers = num_workers
+
+    def _prepare(self, scene_traj):
+        df = scene_traj.reset_index(drop=True)
+        for col in ('vx', 'vy'):
+            if col not in df.columns:
+                df[col] = 0.0
+        if 'heading' not in df.columns:
+            # nuScenes 提取结果没有航向，用速度方向近似
+            df['heading'] = np.arctan2(df['vy'], df['vx'])
+        return df
+
+    def _lengths(self, df, obj_type):
+        """车长缺失时按类别取默认值，与 get_box_coords 一致"""
+        defaults = self.cfg['defaults']
+        default_length = np.select(
+            [obj_type.str.contains('PEDESTRIAN').to_numpy(), obj_type.str.contains('CYCLIST').to_numpy()],
+            [defaults['ped_length'], defaults['cyc_length']],
+            default=defaults['car_length'])
+        length = df['length'].to_numpy(dtype=float) if 'length' in df.columns else np.full(len(df), np.nan)
+        return np.where(length >= 0.1, length, default_length)
+
+    def _neighbor_pairs(self, x, y, frame_idx):
+        """
+        半径内全部同帧邻居，返回按 (src, 距离) 排序的有向边 src -> dst 及距离
+        """
+        tree = cKDTree(np.column_stack([x, y, frame_idx * FRAME_OFFSET]))
+        pairs = tree.query_pairs(self.radius, output_type='ndarray')
+        src = np.concatenate([pairs[:, 0], pairs[:, 1]])
+        dst = np.concatenate([pairs[:, 1], pairs[:, 0]])
+        dist = np.hypot(x[dst] - x[src], y[dst] - y[src])
+
+        order = np.lexsort((dist, src))
+        src, dst, dist = src[order], dst[order], dist[order]
+        if self.k_neighbors is not None:
+            row_start = np.searchsorted(src, src, side='left')
+            keep = np.arange(len(src)) - row_start < self.k_neighbors
+            src, dst, dist = src[keep], dst[keep], dist[keep]
+        return src, dst, dist
+
+    def compute_scene(self, scene_traj):
+        """计算单个场景每个智能体每帧的最近邻、前车间距、相对速度与 TTC"""
+        df = self._prepare(scene_traj)
+        n = len(df)
+        frames = np.unique(df['frame_id'].to_numpy())
+        frame_idx = np.searchsorted(frames, df['frame_id'].to_numpy())
+
+        x, y = df['x'].to_numpy(dtype=float), df['y'].to_numpy(dtype=float)
+        heading = df['heading'].to_numpy(dtype=float)
+        vx, vy = df['vx'].to_numpy(dtype=float), df['vy'].to_numpy(dtype=float)
+        obj_type = df['type'].astype(str).str.upper() if 'type' in df.columns else pd.Series([''] * n)
+        is_vehicle = obj_type.str.contains('VEHICLE').to_numpy()
+        length = self._lengths(df, obj_type)
+        track_ids = df['track_id'].to_numpy()
+
+        src, dst, dist = self._neighbor_pairs(x, y, frame_idx)
+
+        # 最近邻: 边已按 (src, 距离) 排序，每个 src 的第一条边即为最近
+        first = np.flatnonzero(np.r_[True, src[1:] != src[:-1]]) if len(src) else np.array([], dtype=np.int64)
+        nearest_id = np.full(n, None, dtype=object)
+        nearest_dist = np.full(n, np.nan)
+        nearest_id[src[first]] = track_ids[dst[first]]
+        nearest_dist[src[first]] = dist[first]
+
+        # 将邻居位置投影到本车坐标系
+        c, s = np.cos(heading), np.sin(heading)
+        dx, dy = x[dst] - x[src], y[dst] - y[src]
+        lon = dx * c[src] + dy * s[src]
+        lat = -dx * s[src] + dy * c[src]
+        dh = np.angle(np.exp(1j * (heading[dst] - heading[src])))
+
+        is_lead = is_vehicle[dst] & (lon > 0) & (np.abs(lat) < self.lane_half_width) \
+            & (np.abs(dh) < self.max_heading_diff)
+        l_src, l_dst, l_lon = src[is_lead], dst[is_lead], lon[is_lead]
+        order = np.lexsort((l_lon, l_src))
+        l_src, l_dst, l_lon = l_src[order], l_dst[order], l_lon[order]
+        pick = np.flatnonzero(np.r_[True, l_src[1:] != l_src[:-1]]) if len(l_src) else np.array([], dtype=np.int64)
+
+        has_lead = np.zeros(n, dtype=bool)
+        lead = np.zeros(n, dtype=np.int64)
+        lead_lon = np.full(n, np.nan)
+        has_lead[l_src[pick]] = True
+        lead[l_src[pick]] = l_dst[pick]
+        lead_lon[l_src[pick]] = l_lon[pick]
+
+        gap = lead_lon - (length + length[lead]) / 2.0
+        v_self = vx * c + vy * s
+        v_lead = vx[lead] * c + vy[lead] * s
+        rel_speed = v_self - v_lead
+        # 已接触/重叠且仍在接近时 TTC 为 0，不再接近时为 inf
+        closing = rel_speed > 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ttc = np.where(closing & (gap > 0), gap / rel_speed, np.where(closing, 0.0, np.inf))
+
+        overlap = np.zeros(n, dtype=bool)
+        close = np.flatnonzero(has_lead & (gap <= 0))
+        for i in close:
+            overlap[i] = _polygon_overlap(get_box_coords(df.iloc[i], self.cfg),
+                                          get_box_coords(df.iloc[lead[i]], self.cfg))
+
+        return pd.DataFrame({
+            'scenario_id': df['scenario_id'].to_numpy(),
+            'frame_id': df['frame_id'].to_numpy(),
+            'track_id': track_ids,
+            'nearest_id': nearest_id,
+            'nearest_dist': nearest_dist.astype(np.float32),
+            'lead_id': np.where(has_lead, track_ids[lead], None),
+            'gap': np.where(has_lead, gap, np.nan).astype(np.float32),
+            'rel_speed': np.where(has_lead, rel_speed, np.nan).astype(np.float32),
+            'ttc': np.where(has_lead, ttc, np.nan).astype(np.float32),
+            'overlap': overlap
+        }, columns=METRIC_COLUMNS)
+
+    def compute(self, df_traj):
+        """按场景并行计算，返回整张指标表"""
+        scenes = [g for _, g in df_traj.groupby('scenario_id', sort=False)]
+        if not scenes:
+            return pd.DataFrame(columns=METRIC_COLUMNS)
+        with ProcessPoolExecutor(max_workers=self.num_workers) as pool:
+            results = list(pool.map(self.compute_scene, scenes, chunksize=max(1, len(scenes) // 64)))
+        return pd.concat(results, ignore_index=True)
+
+    def run(self, traj_path, output_path):
+        if not os.path.exists(traj_path):
+            print(f"❌ 错误：找不到轨迹文件 {traj_path}")
+            return
+
+        print(f"🚀 正在计算交互指标: {os.path.basename(traj_path)}")
+        df = self.compute(pd.read_csv(traj_path))
+        df.to_csv(output_path, index=False)
+        print(f"✅ 保存成功: {output_path} (数据行数: {len(df)})")
+
+if __name__ == "__main__":
+    cfg = load_config()
+    parser = argparse.ArgumentParser(description="逐帧交互指标计算 (最近邻 / 前车间距 / TTC)")
+    parser.add_argument("--traj", default=cfg['paths']['traj_file'])
+    parser.add_argument("--output", default="output/interaction_metrics.csv")
+    parser.add_argument("--radius", type=float, default=50.0)
+    parser.add_argument("--k_neighbors", type=int, default=None, help="每个智能体最多保留的邻居数，默认不截断")
+    parser.add_argument("--lane_half_width", type=float, default=1.8)
+    parser.add_argument("--num_workers", type=int, default=None)
+    args = parser.parse_args()
+
+    engine = InteractionMetrics(radius=args.radius, k_neighbors=args.k_neighbors,
+                                lane_half_width=args.lane_half_width, num_workers=args.num_workers)
+    engine.run(args.traj, args.output)
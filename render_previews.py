@@ -0,0 +1,149 @@
+import os
+import json
+import html
+import hashlib
+import argparse
+import importlib.util
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from utils import load_config, process_scene
+from scene_figure import build_scene_figure
+
+MANIFEST_FILE = "manifest.json"
+# 每完成若干场景保存一次 manifest，中断后已完成的场景仍能命中缓存
+MANIFEST_SAVE_EVERY = 50
+
+# 修改 scene_figure 的绘图逻辑后递增，使旧缓存全部失效
+RENDER_VERSION = 2
+
+def scene_hash(scene_traj, scene_map, cfg):
+    """以场景输入数据与可视化配置计算缓存键"""
+    h = hashlib.sha1()
+    h.update(str(RENDER_VERSION).encode())
+    h.update(json.dumps(cfg, sort_keys=True, default=str).encode())
+    for df in (scene_traj, scene_map):
+        h.update(','.join(map(str, df.columns)).encode())
+        h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+def safe_name(scenario_id):
+    return "".join(c if c.isalnum() or c in '-_' else '_' for c in str(scenario_id))
+
+def render_scene(scenario_id, scene_traj, scene_map, cfg, output_dir, thumbnail):
+    """在子进程中渲染单个场景，返回生成的文件名"""
+    scene_traj, scene_map, static_df, moving_cars_df, vrus_df = process_scene(scene_traj, scene_map)
+    fig = build_scene_figure(scene_traj, scene_map, static_df, moving_cars_df, vrus_df, cfg)
+
+    name = safe_name(scenario_id)
+    # plotly.js 只在输出目录写一份，所有 HTML 共享引用
+    fig.write_html(os.path.join(output_dir, f"{name}.html"), include_plotlyjs='directory', auto_play=False)
+    outputs = {'html': f"{name}.html"}
+    if thumbnail:
+        # kaleido 可导入但缺少可用的浏览器后端时会在这里失败，不影响已生成的 HTML
+        try:
+            fig.write_image(os.path.join(output_dir, f"{name}.png"), width=480, height=480)
+            outputs['thumbnail'] = f"{name}.png"
+        except Exception as e:
+            print(f"⚠️ 场景 {scenario_id} 缩略图生成失败: {e}")
+    return outputs
+
+class PreviewRenderer:
+    def __init__(self, output_dir="output/previews", config_path="config.yaml", num_workers=None, thumbnail=True):
+        """
+        参数:
+            thumbnail: 是否输出 PNG 缩略图，未安装 kaleido 时自动关闭
+        """
+        self.output_dir = output_dir
+        self.cfg = load_config(config_path)
+        self.num_workers = num_workers
+        self.thumbnail = thumbnail and importlib.util.find_spec('kaleido') is not None
+        if thumbnail and not self.thumbnail:
+            print("⚠️ 未检测到 kaleido，跳过缩略图生成")
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+
+    def _load_manifest(self):
+        path = os.path.join(self.output_dir, MANIFEST_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_manifest(self, manifest):
+        # 先写临时文件再替换，避免保存过程中被中断导致 manifest 损坏
+        path = os.path.join(self.output_dir, MANIFEST_FILE)
+        with open(path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(path + ".tmp", path)
+
+    def _write_index(self, manifest):
+        items = []
+        for scenario_id, entry in sorted(manifest.items()):
+            outputs = entry['outputs']
+            thumb = f'<img src="{html.escape(outputs["thumbnail"])}" width="240"><br>' if 'thumbnail' in outputs else ''
+            items.append(f'<li><a href="{html.escape(outputs["html"])}">{thumb}{html.escape(scenario_id)}</a></li>')
+        with open(os.path.join(self.output_dir, "index.html"), 'w', encoding='utf-8') as f:
+            f.write(f"<html><head><meta charset='utf-8'><title>Scenario Previews</title></head>"
+                    f"<body><ul>{''.join(items)}</ul></body></html>")
+
+    def run(self, traj_path, map_path, scenario_ids=None):
+        if not os.path.exists(traj_path):
+            print(f"❌ 错误：找不到轨迹文件 {traj_path}")
+            return
+
+        df_traj = pd.read_csv(traj_path)
+        df_map = pd.read_csv(map_path) if map_path and os.path.exists(map_path) else pd.DataFrame()
+        if scenario_ids:
+            df_traj = df_traj[df_traj['scenario_id'].astype(str).isin(scenario_ids)]
+        map_groups = dict(tuple(df_map.groupby('scenario_id', sort=False))) if not df_map.empty else {}
+
+        manifest = self._load_manifest()
+        tasks = []
+        for scenario_id, scene_traj in df_traj.groupby('scenario_id', sort=False):
+            scene_map = map_groups.get(scenario_id, pd.DataFrame())
+            key = scene_hash(scene_traj, scene_map, self.cfg)
+            entry = manifest.get(str(scenario_id))
+            # 缩略图已尝试过 (成功或失败) 的场景同样视为命中缓存
+            if entry and entry['hash'] == key and (not self.thumbnail or entry.get('thumbnail')) \
+                    and os.path.exists(os.path.join(self.output_dir, entry['outputs']['html'])):
+                continue
+            tasks.append((scenario_id, scene_traj.copy(), scene_map.copy(), key))
+
+        n_total = df_traj['scenario_id'].nunique()
+        print(f"🚀 共 {n_total} 个场景，命中缓存 {n_total - len(tasks)} 个，待渲染 {len(tasks)} 个")
+
+        n_done = 0
+        try:
+            with ProcessPoolExecutor(max_workers=self.num_workers) as pool:
+                futures = {
+                    pool.submit(render_scene, sid, traj, smap, self.cfg, self.output_dir, self.thumbnail): (sid, key)
+                    for sid, traj, smap, key in tasks
+                }
+                for future in as_completed(futures):
+                    sid, key = futures[future]
+                    try:
+                        manifest[str(sid)] = {'hash': key, 'outputs': future.result(), 'thumbnail': self.thumbnail}
+                        n_done += 1
+                    except Exception as e:
+                        print(f"❌ 渲染场景 {sid} 时出错: {e}")
+                        continue
+                    if n_done % MANIFEST_SAVE_EVERY == 0:
+                        self._save_manifest(manifest)
+        finally:
+            self._save_manifest(manifest)
+            self._write_index(manifest)
+        print(f"✅ 渲染完成 {n_done} 个场景，预览入口: {os.path.join(self.output_dir, 'index.html')}")
+
+if __name__ == "__main__":
+    cfg = load_config()
+    parser = argparse.ArgumentParser(description="离线批量渲染场景预览")
+    parser.add_argument("--traj", default=cfg['paths']['traj_file'])
+    parser.add_argument("--map", default=cfg['paths']['map_file'])
+    parser.add_argument("--output_dir", default="output/previews")
+    parser.add_argument("--scenario_ids", nargs='*', default=None, help="仅渲染指定场景")
+    parser.add_argument("--num_workers", type=int, default=None)
+    parser.add_argument("--no_thumbnail", action='store_true')
+    args = parser.parse_args()
+
+    renderer = PreviewRenderer(args.output_dir, num_workers=args.num_workers, thumbnail=not args.no_thumbnail)
+    renderer.run(args.traj, args.map, args.scenario_ids)
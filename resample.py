@@ -0,0 +1,85 @@
+import os
+import argparse
+import numpy as np
+import pandas as pd
+
+# 线性插值的数值列 (存在才处理)，heading 单独做角度插值
+LINEAR_COLUMNS = ['x', 'y', 'z', 'vx', 'vy', 'length', 'width', 'height']
+EPS = 1e-6
+
+def wrap_angle(a):
+    return (a + np.pi) % (2 * np.pi) - np.pi
+
+def resample_tracks(df_traj, rate_hz=10.0, max_gap=1.0):
+    """
+    将所有轨迹插值到统一频率的时间轴上
+    参数:
+        df_traj: UIDM 轨迹表，需包含 scenario_id / track_id / timestamp (秒)
+        rate_hz: 目标频率
+        max_gap: 相邻原始采样间隔超过该值 (秒) 时不跨越插值，避免凭空补出缺失片段
+    返回:
+        重采样后的轨迹表，frame_id 为相对场景起点的网格序号，timestamp 与之一一对应
+    """
+    if df_traj.empty:
+        return df_traj.copy()
+
+    df = df_traj.sort_values(['scenario_id', 'track_id', 'timestamp'], kind='stable')
+    df = df.drop_duplicates(['scenario_id', 'track_id', 'timestamp'], keep='last').reset_index(drop=True)
+    t = df['timestamp'].to_numpy(dtype=float)
+
+    track = pd.factorize(pd.MultiIndex.from_frame(df[['scenario_id', 'track_id']]))[0]
+    starts = np.flatnonzero(np.r_[True, track[1:] != track[:-1]])
+    ends = np.r_[starts[1:], len(df)]
+
+    # 场景起点决定网格原点，保证同一场景内所有轨迹共享 frame_id
+    t0 = df.groupby('scenario_id', sort=False)['timestamp'].transform('min').to_numpy(dtype=float)
+    k_first = np.ceil((t[starts] - t0[starts]) * rate_hz - EPS).astype(np.int64)
+    k_last = np.floor((t[ends - 1] - t0[starts]) * rate_hz + EPS).astype(np.int64)
+    counts = np.maximum(k_last - k_first + 1, 0)
+
+    # 展开成 (轨迹, 网格点) 的查询列表
+    q_track = np.repeat(np.arange(len(starts)), counts)
+    q_k = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(k_first, counts)
+    q_t = t0[starts][q_track] + q_k / rate_hz
+
+    # 每条轨迹时间平移到各自独立的区间，一次 searchsorted 即可完成分组查找
+    span = (t[ends - 1] - t[starts]).max() + 1.0
+    offset = np.repeat(np.arange(len(starts)) * span - t[starts], ends - starts)
+    q_offset = q_track * span - t[starts][q_track]
+    left = np.searchsorted(t + offset, q_t + q_offset + EPS, side='right') - 1
+    left = np.clip(left, starts[q_track], ends[q_track] - 1)
+    right = np.minimum(left + 1, ends[q_track] - 1)
+
+    dt = t[right] - t[left]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        w = np.where(dt > 0, (q_t - t[left]) / dt, 0.0)
+    w = np.clip(w, 0.0, 1.0)
+    keep = (dt <= max_gap + EPS) | (w < EPS) | (w > 1 - EPS)
+
+    out = df.iloc[left].reset_index(drop=True)
+    for col in LINEAR_COLUMNS:
+        if col in df.columns:
+            v = df[col].to_numpy(dtype=float)
+            out[col] = v[left] + w * (v[right] - v[left])
+    if 'heading' in df.columns:
+        h = df['heading'].to_numpy(dtype=float)
+        out['heading'] = wrap_angle(h[left] + w * wrap_angle(h[right] - h[left]))
+
+    out['timestamp'] = q_t
+    out['frame_id'] = q_k
+    out = out[keep]
+    return out.sort_values(['scenario_id', 'frame_id'], kind='stable').reset_index(drop=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="多数据集轨迹统一时间轴重采样")
+    parser.add_argument("--inputs", nargs='+', required=True, help="一个或多个 UIDM 轨迹 CSV")
+    parser.add_argument("--output", default="output/data_resampled.csv")
+    parser.add_argument("--rate", type=float, default=10.0, help="目标频率 (Hz)")
+    parser.add_argument("--max_gap", type=float, default=1.0)
+    args = parser.parse_args()
+
+    df = pd.concat([pd.read_csv(f) for f in args.inputs if os.path.exists(f)], ignore_index=True)
+    print(f"🚀 正在重采样到 {args.rate:g} Hz (原始行数: {len(df)})")
+    df = resample_tracks(df, args.rate, args.max_gap)
+    df.to_csv(args.output, index=False)
+    print(f"✅ 保存成功: {args.output} (数据行数: {len(df)})")
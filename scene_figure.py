@@ -0,0 +1,98 @@
+import pandas as pd
+import plotly.graph_objects as go
+from utils import get_box_coords, get_frame_interval
+
+def _boxes(df, cfg, hover_fn=None):
+    """把一组目标转换成以 None 分隔的闭合矩形折线"""
+    xs_all, ys_all, hover = [], [], []
+    for _, row in df.iterrows():
+        xs, ys = get_box_coords(row, cfg)
+        xs_all.extend(xs); xs_all.append(None)
+        ys_all.extend(ys); ys_all.append(None)
+        if hover_fn is not None:
+            hover.extend([hover_fn(row)]*5); hover.append(None)
+    return xs_all, ys_all, hover
+
+def build_scene_figure(scene_traj, scene_map, static_df, moving_cars_df, vrus_df, cfg):
+    """
+    构建场景回放图 (不依赖 Streamlit，可用于 app.py 与离线批量渲染)
+    参数:
+        前五项为 utils.process_scene 的输出
+        cfg: 配置字典
+    """
+    sorted_frame_ids = sorted(scene_traj['frame_id'].unique())
+    frame_ms = int(round(get_frame_interval(scene_traj) * 1000))
+    fig = go.Figure()
+
+    if not scene_map.empty:
+        for fid, group in scene_map[scene_map['type'] == 'ROAD_EDGE'].groupby('feature_id'):
+            fig.add_trace(go.Scatter(
+                x=group.sort_values('order')['x'], y=group.sort_values('order')['y'],
+                mode='lines', line=dict(color=cfg['visuals']['map']['road_edge'], width=2), hoverinfo='skip'))
+        for fid, group in scene_map[scene_map['type'] == 'ROAD_LINE'].groupby('feature_id'):
+            fig.add_trace(go.Scatter(
+                x=group.sort_values('order')['x'], y=group.sort_values('order')['y'],
+                mode='lines', line=dict(color=cfg['visuals']['map']['road_line'], width=1, dash='dash'), hoverinfo='skip'))
+
+    static_x, static_y, static_hover = _boxes(static_df, cfg, lambda row: f"Static<br>ID: {row['track_id']}")
+    fig.add_trace(go.Scatter(
+        x=static_x, y=static_y, mode='lines', fill='toself',
+        fillcolor=cfg['visuals']['vehicles']['static_color'],
+        line=dict(color=cfg['visuals']['vehicles']['static_border'], width=1),
+        hoverinfo='text', hovertext=static_hover, name='Static Vehicles'
+    ))
+
+    trail_x, trail_y = [], []
+    all_active = pd.concat([moving_cars_df, vrus_df])
+    for tid, group in all_active.groupby('track_id'):
+        trail_x.extend(group['x'].tolist()); trail_x.append(None)
+        trail_y.extend(group['y'].tolist()); trail_y.append(None)
+
+    fig.add_trace(go.Scatter(
+        x=trail_x, y=trail_y, mode='lines',
+        line=dict(color=cfg['visuals']['trail']['color'], width=1),
+        hoverinfo='skip', name='Trails'
+    ))
+
+    cx, cy, _ = _boxes(moving_cars_df[moving_cars_df['frame_id'] == sorted_frame_ids[0]], cfg)
+    fig.add_trace(go.Scatter(
+        x=cx, y=cy, mode='lines', fill='toself',
+        fillcolor=cfg['visuals']['vehicles']['moving_color'],
+        line=dict(color='white', width=1), name='Moving Cars'))
+
+    vx, vy, _ = _boxes(vrus_df[vrus_df['frame_id'] == sorted_frame_ids[0]], cfg)
+    fig.add_trace(go.Scatter(
+        x=vx, y=vy, mode='lines', fill='toself',
+        fillcolor=cfg['visuals']['vrus']['color'],
+        line=dict(color='white', width=1), name='Pedestrians/Cyclists'))
+
+    frames = []
+    for fid in sorted_frame_ids:
+        car_x, car_y, car_h = _boxes(
+            moving_cars_df[moving_cars_df['frame_id'] == fid], cfg,
+            lambda row: f"Car<br>ID: {row['track_id']}<br>V: {row['speed_kmh']:.1f}")
+        vru_x, vru_y, vru_h = _boxes(
+            vrus_df[vrus_df['frame_id'] == fid], cfg,
+            lambda row: f"{row['type']}<br>ID: {row['track_id']}")
+
+        frames.append(go.Frame(
+            data=[
+                go.Scatter(x=car_x, y=car_y, hovertext=car_h),
+                go.Scatter(x=vru_x, y=vru_y, hovertext=vru_h)
+            ],
+            name=str(fid),
+            traces=[len(fig.data)-2, len(fig.data)-1]
+        ))
+
+    fig.frames = frames
+
+    fig.update_layout(
+        plot_bgcolor=cfg['visuals']['plot_bgcolor'],
+        paper_bgcolor=cfg['visuals']['background_color'],
+        xaxis=dict(visible=False, showgrid=False, scaleanchor="y", scaleratio=1),
+        yaxis=dict(visible=False, showgrid=False),
+        font=dict(color="#a0a0a0"), height=800, margin=dict(t=40, b=0, l=0, r=0),
+        updatemenus=[dict(type='buttons', showactive=False, y=1, x=0.1, xanchor='right', yanchor='top', pad=dict(t=0, r=10),
+                          buttons=[dict(label='▶ Play', method='animate', args=[None, dict(frame=dict(duration=frame_ms, redraw=True), fromcurrent=True, mode='immediate')])])]
+    )
+    return fig
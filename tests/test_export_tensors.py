@@ -0,0 +1,76 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from export_tensors import TensorExporter, ScenarioTensorDataset, AGENT_FEATURES, AGENT_TYPE_IDS, MAP_TYPE_IDS
+
+def _scenario(scenario_id, n_frames=8):
+    """ego 位于原点，其余智能体沿 +x 依次变远；far 只在第 3 帧之后出现"""
+    rows = []
+    agents = [('ego', True, 'TYPE_VEHICLE', 0.0), ('near', False, 'TYPE_PEDESTRIAN', 5.0),
+              ('mid', False, 'TYPE_CYCLIST', 10.0), ('far', False, 'TYPE_VEHICLE', 40.0),
+              ('farthest', False, 'TYPE_VEHICLE', 80.0)]
+    for f in range(n_frames):
+        for track_id, is_ego, obj_type, x in agents:
+            if track_id == 'far' and f < 3:
+                continue
+            rows.append(dict(scenario_id=scenario_id, timestamp=f * 0.1, frame_id=f, track_id=track_id,
+                             type=obj_type, is_ego=is_ego, x=x + f, y=0.0, z=0.0, heading=0.0,
+                             vx=10.0, vy=0.0, length=4.0, width=2.0, height=1.5))
+    return rows
+
+def _map(scenario_id):
+    """一条 45 个点的折线 (切成 20 + 20 + 5 三段) 与一条远处的 3 点折线"""
+    rows = [dict(scenario_id=scenario_id, feature_id=1, type='ROAD_EDGE', x=float(i), y=1.0, z=0.0, order=i)
+            for i in range(45)]
+    rows += [dict(scenario_id=scenario_id, feature_id=2, type='CROSSWALK', x=500.0 + i, y=0.0, z=0.0, order=i)
+             for i in range(3)]
+    return rows
+
+def test_export_round_trip(tmp_path):
+    traj_a, traj_b, map_path = tmp_path / "a.csv", tmp_path / "b.csv", tmp_path / "map.csv"
+    pd.DataFrame(_scenario('s0') + _scenario('s1')).to_csv(traj_a, index=False)
+    pd.DataFrame(_scenario('s2')).to_csv(traj_b, index=False)
+    pd.DataFrame(_map('s0') + _map('s2')).to_csv(map_path, index=False)
+
+    exporter = TensorExporter(str(tmp_path / "tensors"), max_agents=4, num_timesteps=5,
+                              max_polylines=3, points_per_polyline=20, shard_size=2)
+    dataset = ScenarioTensorDataset(exporter.export([str(traj_a), str(traj_b)], [str(map_path)]))
+
+    # 3 个场景、shard_size=2: 第二个分片只有 1 个场景，且来自第二个轨迹文件
+    assert len(dataset) == 3
+    assert [s['num_scenarios'] for s in dataset.index['shards']] == [2, 1]
+    assert np.load(tmp_path / "tensors" / "shard_00001_agents.npy", mmap_mode='r').shape[0] == 1
+
+    sample = dataset[0]
+    assert sample['scenario_id'] == 's0'
+    assert sample['agents'].shape == (4, 5, len(AGENT_FEATURES))
+
+    # ego 在第 0 位，其余按距离取最近的 3 个，farthest 被丢弃
+    x0 = sample['agents'][:, 0, AGENT_FEATURES.index('x')]
+    assert np.allclose(x0, [0.0, 5.0, 10.0, 0.0])
+    assert sample['agent_type'].tolist() == [AGENT_TYPE_IDS[t] for t in
+                                             ['TYPE_VEHICLE', 'TYPE_PEDESTRIAN', 'TYPE_CYCLIST', 'TYPE_VEHICLE']]
+
+    # 8 帧截断到 5 帧；far 在前 3 帧缺失，mask 为 False 且数值为 0
+    assert sample['agent_mask'][:3].all()
+    assert sample['agent_mask'][3].tolist() == [False, False, False, True, True]
+    assert np.all(sample['agents'][3, :3] == 0)
+
+    # 45 点折线切成 20/20/5 三段，最远的人行横道被 max_polylines 截掉
+    assert sample['map_mask'].sum(axis=1).tolist() == [20, 20, 5]
+    assert sample['map_type'].tolist() == [MAP_TYPE_IDS['ROAD_EDGE']] * 3
+    assert np.allclose(sample['map'][1, :, 0], np.arange(20, 40))
+    assert not sample['map_mask'][2, 5:].any() and np.all(sample['map'][2, 5:] == 0)
+
+    # 无地图场景全部为填充
+    assert not dataset[1]['map_mask'].any()
+
+    # 跨分片读取
+    last = dataset[2]
+    assert last['scenario_id'] == 's2'
+    assert dataset.index['scenarios'][2] == {'scenario_id': 's2', 'shard': 1, 'offset': 0}
+    assert np.array_equal(last['agents'], sample['agents'])
+    assert last['map_mask'].sum() == 45
@@ -0,0 +1,88 @@
+import os
+import sys
+import sqlite3
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from extract_nuplan import NuPlanExtractor, EGO_REAR_AXLE_TO_CENTER, token_to_str
+
+CATEGORIES = ['vehicle', 'pedestrian', 'bicycle', 'barrier']
+
+def _token(*parts):
+    """与 nuPlan 一致的 8 字节 BLOB token"""
+    return bytes(parts).ljust(8, b'\x00')
+
+def build_synthetic_db(path, n_scenes=2, n_frames=20):
+    """
+    构建最小的 nuPlan 结构 SQLite (scene / lidar_pc / ego_pose / lidar_box / track / category)
+    每个场景 n_frames 帧 20Hz，ego 沿 +x 以 10m/s 行驶，每帧每个类别各 1 个目标
+    """
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE category (token BLOB PRIMARY KEY, name TEXT, description TEXT);
+        CREATE TABLE track (token BLOB PRIMARY KEY, category_token BLOB, width REAL, length REAL, height REAL);
+        CREATE TABLE scene (token BLOB PRIMARY KEY, log_token BLOB, name TEXT);
+        CREATE TABLE ego_pose (token BLOB PRIMARY KEY, timestamp INTEGER, x REAL, y REAL, z REAL,
+                               qw REAL, qx REAL, qy REAL, qz REAL, vx REAL, vy REAL, vz REAL);
+        CREATE TABLE lidar_pc (token BLOB PRIMARY KEY, next_token BLOB, prev_token BLOB,
+                               ego_pose_token BLOB, scene_token BLOB, timestamp INTEGER);
+        CREATE TABLE lidar_box (token BLOB PRIMARY KEY, lidar_pc_token BLOB, track_token BLOB,
+                                x REAL, y REAL, z REAL, width REAL, length REAL, height REAL,
+                                vx REAL, vy REAL, vz REAL, yaw REAL);
+        CREATE INDEX idx_lidar_box_lidar_pc_token ON lidar_box (lidar_pc_token);
+        CREATE INDEX idx_lidar_pc_scene_token ON lidar_pc (scene_token);
+    """)
+    for c, name in enumerate(CATEGORIES):
+        conn.execute("INSERT INTO category VALUES (?, ?, '')", (_token(1, c), name))
+        conn.execute("INSERT INTO track VALUES (?, ?, 1.8, 4.5, 1.5)", (_token(2, c), _token(1, c)))
+
+    for s in range(n_scenes):
+        conn.execute("INSERT INTO scene VALUES (?, ?, ?)", (_token(3, s), _token(9), f"scene-{s}"))
+        for i in range(n_frames):
+            ts = s * 100_000_000 + i * 50_000
+            conn.execute("INSERT INTO ego_pose VALUES (?, ?, ?, 0, 0, 1, 0, 0, 0, 10, 0, 0)",
+                         (_token(4, s, i), ts, i * 0.5))
+            conn.execute("INSERT INTO lidar_pc VALUES (?, NULL, NULL, ?, ?, ?)",
+                         (_token(5, s, i), _token(4, s, i), _token(3, s), ts))
+            for c in range(len(CATEGORIES)):
+                conn.execute("INSERT INTO lidar_box VALUES (?, ?, ?, ?, ?, 0, 1.8, 4.5, 1.5, 5, 0, 0, 0)",
+                             (_token(6, s, i, c), _token(5, s, i), _token(2, c), 20.0 + i * 0.25, 3.5 * c))
+    conn.commit()
+    conn.close()
+
+def test_iter_scenes(tmp_path):
+    db_path = str(tmp_path / "log.db")
+    build_synthetic_db(db_path)
+
+    scenes = list(NuPlanExtractor(str(tmp_path / "out")).iter_scenes(db_path))
+    assert len(scenes) == 2
+
+    df = scenes[0]
+    # 20Hz -> 10Hz: 20 帧取 10 帧，每帧 ego + 4 个目标
+    assert len(df) == 10 * 5
+    assert df['frame_id'].tolist() == sorted(df['frame_id'].tolist())
+    assert np.allclose(np.diff(np.sort(df['timestamp'].unique())), 0.1)
+    assert df['scenario_id'].iloc[0] == _token(3, 0).hex()
+
+    ego = df[df['is_ego']]
+    assert len(ego) == 10
+    # 后轴中心前移到车体中心
+    assert np.allclose(ego['x'].to_numpy(), np.arange(0, 20, 2) * 0.5 + EGO_REAR_AXLE_TO_CENTER)
+    assert np.allclose(ego['vx'], 10) and np.allclose(ego['vy'], 0)
+
+    agents = df[~df['is_ego']]
+    assert set(agents['track_id']) == {token_to_str(_token(2, c)) for c in range(len(CATEGORIES))}
+    assert agents['type'].value_counts().to_dict() == {
+        'TYPE_VEHICLE': 10, 'TYPE_PEDESTRIAN': 10, 'TYPE_CYCLIST': 10, 'TYPE_OTHER': 10
+    }
+
+def test_process_file(tmp_path):
+    db_path = str(tmp_path / "log.db")
+    build_synthetic_db(db_path)
+
+    save_name, n_rows = NuPlanExtractor(str(tmp_path / "out")).process_file(db_path)
+    df = pd.read_csv(save_name)
+    assert n_rows == len(df) == 2 * 10 * 5
+    assert df['scenario_id'].nunique() == 2
+    assert not os.path.exists(save_name + ".tmp")
@@ -0,0 +1,53 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from interaction_metrics import InteractionMetrics
+
+def _row(track_id, obj_type, x, y, vx=0.0, length=4.0):
+    return dict(scenario_id='s', frame_id=0, track_id=track_id, type=obj_type,
+                x=x, y=y, heading=0.0, vx=vx, vy=0.0, length=length, width=2.0)
+
+def test_lead_found_in_dense_scene():
+    """旁边 20 辆停放车辆不应挤掉 30m 外的同车道前车，行人不算前车"""
+    rows = [_row('ego', 'TYPE_VEHICLE', 0, 0, vx=5.0),
+            _row('lead', 'TYPE_VEHICLE', 30, 0),
+            _row('ped', 'TYPE_PEDESTRIAN', 10, 0.5, length=0)]
+    rows += [_row(f'parked_{k}', 'TYPE_VEHICLE', -10 + k, 4) for k in range(20)]
+
+    engine = InteractionMetrics(config_path=os.path.join(ROOT, "config.yaml"))
+    metrics = engine.compute_scene(pd.DataFrame(rows)).set_index('track_id')
+
+    ego = metrics.loc['ego']
+    assert ego['lead_id'] == 'lead'
+    assert np.isclose(ego['gap'], 26.0)
+    assert np.isclose(ego['ttc'], 5.2)
+
+    # 行人缺失尺寸时按 ped_length 计算间距
+    assert metrics.loc['ped', 'lead_id'] == 'lead'
+    assert np.isclose(metrics.loc['ped', 'gap'], 20.0 - (0.6 + 4.0) / 2)
+
+def test_ttc_zero_when_overlapping_and_closing():
+    """前车已重叠且仍在接近时 TTC 为 0，而不是 inf"""
+    rows = [_row('ego', 'TYPE_VEHICLE', 0, 0, vx=5.0), _row('lead', 'TYPE_VEHICLE', 3, 0)]
+
+    engine = InteractionMetrics(config_path=os.path.join(ROOT, "config.yaml"))
+    ego = engine.compute_scene(pd.DataFrame(rows)).set_index('track_id').loc['ego']
+
+    assert ego['lead_id'] == 'lead'
+    assert np.isclose(ego['gap'], -1.0)
+    assert np.isclose(ego['rel_speed'], 5.0)
+    assert ego['overlap']
+    assert ego['ttc'] == 0.0
+
+def test_ttc_inf_when_not_closing():
+    rows = [_row('ego', 'TYPE_VEHICLE', 0, 0, vx=5.0), _row('lead', 'TYPE_VEHICLE', 3, 0, vx=8.0)]
+
+    engine = InteractionMetrics(config_path=os.path.join(ROOT, "config.yaml"))
+    ego = engine.compute_scene(pd.DataFrame(rows)).set_index('track_id').loc['ego']
+
+    assert ego['lead_id'] == 'lead'
+    assert np.isinf(ego['ttc'])
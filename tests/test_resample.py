@@ -0,0 +1,67 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from resample import resample_tracks
+
+def _track(track_id, times, xs, headings=None, scenario_id='s'):
+    headings = headings if headings is not None else [0.0] * len(times)
+    return pd.DataFrame({
+        'scenario_id': scenario_id,
+        'track_id': track_id,
+        'timestamp': times,
+        'frame_id': np.arange(len(times)),
+        'x': xs,
+        'y': 0.0,
+        'heading': headings,
+        'type': 'TYPE_VEHICLE'
+    })
+
+def test_linear_position_2hz_to_10hz():
+    df = resample_tracks(_track('a', [0.0, 0.5, 1.0], [0.0, 5.0, 6.0]), rate_hz=10)
+
+    assert df['frame_id'].tolist() == list(range(11))
+    assert np.allclose(df['timestamp'], np.arange(11) * 0.1)
+    expected = np.r_[np.linspace(0.0, 5.0, 6), np.linspace(5.0, 6.0, 6)[1:]]
+    assert np.allclose(df['x'], expected)
+
+def test_heading_wraps_short_way():
+    df = resample_tracks(_track('a', [0.0, 0.2], [0.0, 0.0], headings=[3.0, -3.0]), rate_hz=10)
+
+    mid = df.loc[df['frame_id'] == 1, 'heading'].iloc[0]
+    # 3.0 与 -3.0 之间最短路径经过 ±π，而不是经过 0
+    assert np.isclose(abs(mid), np.pi)
+    assert np.all(np.abs(df['heading']) > 2.9)
+
+def test_no_rows_inside_long_gap():
+    df = resample_tracks(_track('a', [0.0, 0.5, 3.0], [0.0, 5.0, 30.0]), rate_hz=10, max_gap=1.0)
+
+    t = df['timestamp'].to_numpy()
+    assert not np.any((t > 0.5 + 1e-6) & (t < 3.0 - 1e-6))
+    assert df['frame_id'].tolist() == list(range(6)) + [30]
+    assert np.isclose(df.loc[df['frame_id'] == 30, 'x'].iloc[0], 30.0)
+
+def test_tracks_share_scenario_grid():
+    df = resample_tracks(pd.concat([
+        _track('a', [10.0, 10.5, 11.0], [0.0, 1.0, 2.0]),
+        _track('b', [10.25, 10.75], [0.0, 1.0])
+    ], ignore_index=True), rate_hz=10)
+
+    # 同一 frame_id 对应同一 timestamp，且以场景起点 (10.0) 为原点
+    per_frame = df.groupby('frame_id')['timestamp'].agg(['min', 'max'])
+    assert np.allclose(per_frame['min'], per_frame['max'])
+    assert np.allclose(per_frame['min'], 10.0 + per_frame.index.to_numpy() * 0.1)
+    assert df.loc[df['track_id'] == 'b', 'frame_id'].tolist() == [3, 4, 5, 6, 7]
+
+def test_absolute_timestamps_land_on_samples():
+    """nuScenes 风格的绝对时间戳 (~1.5e9 s) 在采样点上权重为 0，取值精确等于原始样本"""
+    t0 = 1531883530.449377
+    times = [t0, t0 + 0.5, t0 + 1.0]
+    xs = [1.0, 2.0, 7.0]
+    df = resample_tracks(_track('a', times, xs), rate_hz=2)
+
+    assert df['frame_id'].tolist() == [0, 1, 2]
+    assert df['x'].tolist() == xs
+    assert np.allclose(df['timestamp'], times, rtol=0, atol=1e-6)
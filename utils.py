@@ -7,6 +7,15 @@ def load_config(config_path="config.yaml"):
     with open(config_path, 'r', encoding='utf-8') as file:
         return yaml.safe_load(file)
 
+def get_frame_interval(scene_traj, default=0.1):
+    """由时间戳估计帧间隔 (秒)，兼容不同采样频率的数据集"""
+    if 'timestamp' not in scene_traj.columns:
+        return default
+    times = np.unique(scene_traj['timestamp'].to_numpy(dtype=float))
+    if len(times) < 2:
+        return default
+    return float(np.median(np.diff(times)))
+
 def get_box_coords(row, config):
     """
     计算旋转后的矩形框坐标
@@ -44,4 +53,45 @@ def get_box_coords(row, config):
     x_coords = np.append(corners_final[:, 0], corners_final[0, 0])
     y_coords = np.append(corners_final[:, 1], corners_final[0, 1])
     
-    return x_coords, y_coords
\ No newline at end of file
+    return x_coords, y_coords
+
+def process_scene(scene_traj, scene_map):
+    """
+    对单个场景执行动静分离 (不依赖 Streamlit 缓存，供离线批处理复用)
+    """
+    if 'frame_id' not in scene_traj.columns:
+        scene_traj['frame_id'] = np.unique(scene_traj['timestamp'].to_numpy(), return_inverse=True)[1]
+    scene_traj = scene_traj.sort_values(by="frame_id")
+
+ 
+    if 'vx' in scene_traj.columns:
+        scene_traj['speed_kmh'] = (scene_traj['vx']**2 + scene_traj['vy']**2)**0.5 * 3.6
+    else:
+        scene_traj['speed_kmh'] = 0
+
+    track_stats = scene_traj.groupby('track_id').agg({
+        'speed_kmh': 'max',
+        'type': 'first'
+    })
+    
+    is_vehicle = track_stats['type'].astype(str).str.contains('VEHICLE')
+    is_low_speed = track_stats['speed_kmh'] < 1.0
+    
+
+    static_mask = is_vehicle & is_low_speed
+    
+    static_track_ids = track_stats[static_mask].index.tolist()
+    active_track_ids = track_stats[~static_mask].index.tolist()
+    
+
+    static_df = scene_traj[scene_traj['track_id'].isin(static_track_ids)]
+    active_df = scene_traj[scene_traj['track_id'].isin(active_track_ids)]
+    
+ 
+    moving_cars_df = active_df[active_df['type'].str.contains('VEHICLE', na=False)]
+    vrus_df = active_df[~active_df['type'].str.contains('VEHICLE', na=False)]
+
+    
+    static_df_first = static_df.groupby('track_id').first().reset_index()
+
+    return scene_traj, scene_map, static_df_first, moving_cars_df, vrus_df